@@ -6,20 +6,31 @@ PyPOTS package.
 # License: BSD-3-Clause
 
 
-from . import (
-    imputation,
-    classification,
-    clustering,
-    forecasting,
-    anomaly_detection,
-    representation,
-    optim,
-    data,
-    utils,
-)
+import importlib
+import pkgutil
+from typing import TYPE_CHECKING
+
 from .timeseries_ai import TimeSeriesAI
 from .version import __version__
 
+if TYPE_CHECKING:
+    from . import (
+        imputation,
+        classification,
+        clustering,
+        forecasting,
+        anomaly_detection,
+        representation,
+        optim,
+        data,
+        utils,
+    )
+
+# subpackages are imported lazily on the first access (PEP 562),
+# so importing one task subpackage doesn't pay the cost of importing all the others.
+# All submodules of this package, e.g. `imputation`, `nn` and `base`, can be resolved in this way.
+_SUBMODULES = {module_info.name for module_info in pkgutil.iter_modules(__path__)}
+
 __all__ = [
     "TimeSeriesAI",
     "imputation",
@@ -33,3 +44,15 @@ __all__ = [
     "utils",
     "__version__",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # importing a submodule binds it to this package, so __getattr__ won't be invoked again for this name
+    return importlib.import_module(f".{name}", __name__)
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
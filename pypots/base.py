@@ -5,18 +5,18 @@ The base (abstract) classes for models in PyPOTS.
 # Created by Wenjie Du <wenjay.du@gmail.com>
 # License: BSD-3-Clause
 
+import math
 import os
 from abc import ABC, abstractmethod
 from copy import deepcopy
 from datetime import datetime
 from typing import Optional, Union, Iterable
 
-import numpy as np
 import torch
 from torch.utils.data import DataLoader
 from torch.utils.tensorboard import SummaryWriter
 
-from .nn.functional import autocast
+from .nn.functional import autocast, grad_scaler
 from .nn.modules.loss import Criterion
 from .utils.file import create_dir_if_not_exist
 from .utils.logging import logger, logger_creator
@@ -98,6 +98,9 @@ class BaseModel(ABC):
         # default as false, determine in _setup_device() with consideration on enable_amp and cuda availability
         self.amp_enabled = False
         self.enable_amp = enable_amp
+        # the dtype for autocast when AMP is enabled, float16 is the default one of torch.autocast on CUDA,
+        # models can override it, e.g. with bfloat16 which doesn't need loss scaling
+        self.amp_dtype = torch.float16
 
         if not self.verbose:
             logger_creator.set_level("warning")
@@ -184,6 +187,27 @@ class BaseModel(ABC):
                     "does not support AMP operation. AMP will be disabled."
                 )
 
+    def _setup_amp_dtype(self, amp_dtype: torch.dtype) -> None:
+        """Set the dtype for autocast when AMP is enabled.
+        bfloat16 is only natively supported by CUDA GPUs with compute capability >= 8.0 (Ampere and newer),
+        so fall back to float16 on older GPUs, which gets loss scaling in _train_model().
+
+        Parameters
+        ----------
+        amp_dtype :
+            The desired dtype for autocast, e.g. torch.bfloat16 or torch.float16.
+
+        """
+        if self.amp_enabled and amp_dtype == torch.bfloat16:
+            device = self.device[0] if isinstance(self.device, list) else self.device
+            if device.type == "cuda" and torch.cuda.get_device_capability(device)[0] < 8:
+                logger.warning(
+                    "‼️ bfloat16 is not natively supported by the current CUDA device. "
+                    "AMP will use float16 with loss scaling instead."
+                )
+                amp_dtype = torch.float16
+        self.amp_dtype = amp_dtype
+
     def _setup_path(self, saving_path) -> None:
         MODEL_NO_NEED_TO_SAVE = [
             "LOCF",
@@ -230,10 +254,11 @@ class BaseModel(ABC):
 
     def _send_data_to_given_device(self, data) -> Iterable:
         if isinstance(self.device, (torch.device, list)):  # single device or parallely training on multiple devices
+            # non_blocking makes the copies from pinned memory asynchronous, and it has no effect on pageable memory
             if isinstance(self.device, list):
-                data = map(lambda x: x.to(self.device[0]), data)
+                data = map(lambda x: x.to(self.device[0], non_blocking=True), data)
             else:
-                data = map(lambda x: x.to(self.device), data)
+                data = map(lambda x: x.to(self.device, non_blocking=True), data)
 
         else:  # CPU
             data = map(lambda x: x.to("cpu"), data)
@@ -521,6 +546,18 @@ class BaseNNModel(BaseModel):
         The number of subprocesses to use for data loading.
         `0` means data loading will be in the main process, i.e. there won't be subprocesses.
 
+    pin_memory :
+        Whether to put the fetched data tensors into pinned (page-locked) memory before returning them, which makes
+        host-to-device copies faster. It only works when the model runs on CUDA devices.
+
+    persistent_workers :
+        Whether to keep the data loading subprocesses alive across epochs instead of re-creating them for each epoch.
+        If given as None, it will be True when `num_workers` > 0. It only works when `num_workers` > 0.
+
+    prefetch_factor :
+        The number of batches loaded in advance by each data loading subprocess.
+        If not given, PyTorch's default will be used. It only works when `num_workers` > 0.
+
     device :
         The device for the model to run on. It can be a string, a :class:`torch.device` object, or a list of them.
         If not given, will try to use CUDA devices first (will use the default CUDA device if there are multiple),
@@ -579,6 +616,9 @@ class BaseNNModel(BaseModel):
         epochs: int,
         patience: Optional[int] = None,
         num_workers: int = 0,
+        pin_memory: bool = False,
+        persistent_workers: Optional[bool] = False,
+        prefetch_factor: Optional[int] = None,
         device: Optional[Union[str, torch.device, list]] = None,
         enable_amp: bool = False,
         saving_path: str = None,
@@ -638,6 +678,9 @@ class BaseNNModel(BaseModel):
         self.validation_metric_name = validation_metric_name
         self.original_patience = patience
         self.num_workers = num_workers
+        self.pin_memory = pin_memory
+        self.persistent_workers = num_workers > 0 if persistent_workers is None else persistent_workers
+        self.prefetch_factor = prefetch_factor
 
         self.model = None
         self.num_params = None
@@ -654,6 +697,68 @@ class BaseNNModel(BaseModel):
             f"the number of trainable parameters: {self.num_params:,}"
         )
 
+    def _compile_model(
+        self,
+        modules: Optional[Iterable[torch.nn.Module]] = None,
+        mode: str = "default",
+    ) -> None:
+        """Compile the NN model (or only the given submodules of it) with torch.compile() to fuse operations.
+
+        Parameters
+        ----------
+        modules :
+            The submodules to compile. If not given, the whole model will be compiled.
+
+        mode :
+            The compiling mode for torch.compile(), e.g. "default", "reduce-overhead", "max-autotune".
+
+        Notes
+        -----
+        Modules are compiled in place with ``nn.Module.compile()``, hence keys in the model's state_dict stay the same
+        and model files saved from compiled and non-compiled models are compatible with each other.
+
+        """
+        if not hasattr(torch.nn.Module, "compile"):
+            logger.warning(
+                f"‼️ Compiling the model requires PyTorch>=2.2, but got {torch.__version__}. "
+                "The model will not be compiled."
+            )
+            return
+
+        import torch._dynamo
+
+        # fall back to the eager mode rather than failing the training if some graphs cannot be compiled
+        torch._dynamo.config.suppress_errors = True
+
+        if modules is None:
+            modules = [self.model.module if isinstance(self.model, torch.nn.DataParallel) else self.model]
+        for module in modules:
+            module.compile(mode=mode, dynamic=False)
+        logger.info(f"{self.__class__.__name__} has been compiled with torch.compile(mode='{mode}')")
+
+    def _get_dataloader_kwargs(self) -> dict:
+        """Get the arguments for DataLoader related to data loading performance,
+        i.e. num_workers, pin_memory, persistent_workers, and prefetch_factor.
+
+        Returns
+        -------
+        dict,
+            A python dictionary contains the arguments to pass to torch.utils.data.DataLoader.
+        """
+        # pinning host memory only makes sense when there is a CUDA device to consume the pinned data,
+        # otherwise it just bloats the RAM usage
+        device = self.device[0] if isinstance(self.device, list) else self.device
+        kwargs = {
+            "num_workers": self.num_workers,
+            "pin_memory": self.pin_memory and device.type == "cuda",
+        }
+        # persistent_workers and prefetch_factor are only valid for multiprocess data loading
+        if self.num_workers > 0:
+            kwargs["persistent_workers"] = self.persistent_workers
+            if self.prefetch_factor is not None:
+                kwargs["prefetch_factor"] = self.prefetch_factor
+        return kwargs
+
     @abstractmethod
     def _assemble_input_for_training(self, data: list) -> dict:
         """Assemble the given data into a dictionary for training input.
@@ -710,6 +815,18 @@ class BaseNNModel(BaseModel):
         """
         raise NotImplementedError
 
+    def _snapshot_model_dict(self) -> dict:
+        """Take a snapshot of the model weights as detached CPU tensors.
+        state_dict() only returns references to the weights which get overwritten by later training steps,
+        and keeping the snapshot on CPU doesn't take extra device memory.
+
+        Returns
+        -------
+        dict,
+            The copy of the model's state_dict.
+        """
+        return {k: v.detach().to("cpu", copy=True) for k, v in self.model.state_dict().items()}
+
     def _train_model(
         self,
         train_dataloader: DataLoader,
@@ -718,48 +835,63 @@ class BaseNNModel(BaseModel):
         # each training starts from the very beginning, so reset the loss and model dict here
         self.best_model_dict = None
 
-        if self.validation_metric.lower_better:
+        lower_better = self.validation_metric.lower_better
+        if lower_better:
             self.best_loss = float("inf")
         else:
             self.best_loss = float("-inf")
 
+        # loss scaling is only needed for float16 AMP, bfloat16 has the same dynamic range as float32
+        scaler = grad_scaler(enabled=self.amp_enabled and self.amp_dtype == torch.float16)
+
+        # bind the model and the input assemblers to locals once, to avoid attribute lookups on every step
+        model = self.model
+        assemble_input_for_training = self._assemble_input_for_training
+        assemble_input_for_validating = self._assemble_input_for_validating
+
+        # read the environment variable only once rather than on every epoch
+        enable_hpo = bool(os.getenv("ENABLE_HPO", False))
+
         try:
             training_step = 0
             for epoch in range(1, self.epochs + 1):
-                self.model.train()
-                epoch_train_loss_collector = []
+                model.train()
+                # accumulate losses on device and only sync with the host once at the end of the epoch,
+                # calling .item() for every step would block the pipeline on each of them
+                epoch_train_loss_sum, n_train_steps = torch.zeros(()), 0
                 for idx, data in enumerate(train_dataloader):
                     training_step += 1
-                    inputs = self._assemble_input_for_training(data)
+                    inputs = assemble_input_for_training(data)
 
-                    with autocast(enabled=self.amp_enabled):
-                        self.optimizer.zero_grad()
-                        results = self.model(inputs, calc_criterion=True)
+                    with autocast(enabled=self.amp_enabled, dtype=self.amp_dtype):
+                        self.optimizer.zero_grad(set_to_none=True)
+                        results = model(inputs, calc_criterion=True)
                         loss = results["loss"].sum()
-                        loss.backward()
-                        self.optimizer.step()
-                    epoch_train_loss_collector.append(loss.item())
+                        scaler.scale(loss).backward()
+                        self.optimizer.step(grad_scaler=scaler)
+                    epoch_train_loss_sum = epoch_train_loss_sum + loss.detach()
+                    n_train_steps += 1
 
                     # save training loss logs into the tensorboard file for every step if in need
                     if self.summary_writer is not None:
                         self._save_log_into_tb_file(training_step, "training", results)
                 # mean training loss of the current epoch
-                mean_train_loss = np.mean(epoch_train_loss_collector)
+                mean_train_loss = (epoch_train_loss_sum / n_train_steps).item()
 
                 if val_dataloader is not None:
-                    self.model.eval()
-                    val_metric_collector = []
-                    with torch.no_grad():
+                    model.eval()
+                    val_metric_sum, n_val_steps = torch.zeros(()), 0
+                    with torch.inference_mode():
                         for idx, data in enumerate(val_dataloader):
-                            inputs = self._assemble_input_for_validating(data)
+                            inputs = assemble_input_for_validating(data)
 
-                            with autocast(enabled=self.amp_enabled):
-                                results = self.model(inputs, calc_criterion=True)
+                            with autocast(enabled=self.amp_enabled, dtype=self.amp_dtype):
+                                results = model(inputs, calc_criterion=True)
 
-                            val_metric = results["metric"].sum()
-                            val_metric_collector.append(val_metric.detach().item())
+                            val_metric_sum = val_metric_sum + results["metric"].sum().detach()
+                            n_val_steps += 1
 
-                    mean_val_metric = np.mean(val_metric_collector)
+                    mean_val_metric = (val_metric_sum / n_val_steps).item()
 
                     # save validation loss logs into the tensorboard file for every epoch if in need
                     if self.summary_writer is not None:
@@ -778,15 +910,13 @@ class BaseNNModel(BaseModel):
                     logger.info(f"Epoch {epoch:03d} - training loss ({self.training_loss_name}): {mean_train_loss:.4f}")
                     mean_loss = mean_train_loss
 
-                if np.isnan(mean_loss):
+                if math.isnan(mean_loss):
                     logger.warning(f"‼️ Got NaN loss in epoch#{epoch}. This may lead to unexpected errors.")
 
-                if (self.validation_metric.lower_better and mean_loss < self.best_loss) or (
-                    not self.validation_metric.lower_better and mean_loss > self.best_loss
-                ):
+                if (lower_better and mean_loss < self.best_loss) or (not lower_better and mean_loss > self.best_loss):
                     self.best_epoch = epoch
                     self.best_loss = mean_loss
-                    self.best_model_dict = deepcopy(self.model.state_dict())
+                    self.best_model_dict = self._snapshot_model_dict()
                     self.patience = self.original_patience
                 else:
                     self.patience -= 1
@@ -797,7 +927,7 @@ class BaseNNModel(BaseModel):
                     saving_name=f"{self.__class__.__name__}_epoch{epoch}_{self.validation_metric_name}{mean_loss:.4f}",
                 )
 
-                if os.getenv("ENABLE_HPO", False):
+                if enable_hpo:
                     nni.report_intermediate_result(mean_loss)
                     if epoch == self.epochs - 1 or self.patience == 0:
                         nni.report_final_result(self.best_loss)
@@ -821,7 +951,7 @@ class BaseNNModel(BaseModel):
                     "If you don't want it, please try fit() again."
                 )
 
-        if np.isnan(self.best_loss) or self.best_loss.__eq__(float("inf")):
+        if math.isnan(self.best_loss) or self.best_loss.__eq__(float("inf")):
             raise ValueError("Something is wrong. best_loss is NaN/Inf after training.")
 
         logger.info(f"Finished training. The best model is from epoch#{self.best_epoch}.")
@@ -1,19 +1,43 @@
 """
 Expose all time-series classification models.
+
+Models are imported lazily on the first access (PEP 562), so importing this package doesn't pay the cost of
+importing every model's submodules.
 """
 
 # Created by Wenjie Du <wenjay.du@gmail.com>
 # License: BSD-3-Clause
 
-from .brits import BRITS
-from .csai import CSAI
-from .grud import GRUD
-from .itransformer import iTransformer
-from .raindrop import Raindrop
-from .saits import SAITS
-from .tefn import TEFN
-from .timesnet import TimesNet
-from .ts2vec import TS2Vec
+import importlib
+import pkgutil
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .brits import BRITS
+    from .csai import CSAI
+    from .grud import GRUD
+    from .itransformer import iTransformer
+    from .raindrop import Raindrop
+    from .saits import SAITS
+    from .tefn import TEFN
+    from .timesnet import TimesNet
+    from .ts2vec import TS2Vec
+
+# the mapping from the model name to the submodule implementing it
+_MODEL_TO_SUBMODULE = {
+    "CSAI": ".csai",
+    "BRITS": ".brits",
+    "GRUD": ".grud",
+    "Raindrop": ".raindrop",
+    "TS2Vec": ".ts2vec",
+    "SAITS": ".saits",
+    "TimesNet": ".timesnet",
+    "iTransformer": ".itransformer",
+    "TEFN": ".tefn",
+}
+
+# all submodules of this package, e.g. `saits` and `base`
+_SUBMODULES = {module_info.name for module_info in pkgutil.iter_modules(__path__)}
 
 __all__ = [
     "CSAI",
@@ -26,3 +50,21 @@ __all__ = [
     "iTransformer",
     "TEFN",
 ]
+
+
+def __getattr__(name: str):
+    if name in _MODEL_TO_SUBMODULE:
+        model = getattr(importlib.import_module(_MODEL_TO_SUBMODULE[name], __name__), name)
+        globals()[name] = model  # cache it, so __getattr__ won't be invoked again for this name
+        return model
+
+    if name in _SUBMODULES:
+        # keep submodules like `pypots.classification.saits` accessible as attributes,
+        # importing a submodule binds it to this package, so __getattr__ won't be invoked again for this name
+        return importlib.import_module(f".{name}", __name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
@@ -454,7 +454,7 @@ class BaseNNClassifier(BaseNNModel):
         dict_result_collector = []
         for idx, data in enumerate(test_dataloader):
             inputs = self._assemble_input_for_testing(data)
-            with autocast(enabled=self.amp_enabled):
+            with autocast(enabled=self.amp_enabled, dtype=self.amp_dtype):
                 results = self.model(inputs, **kwargs)
             dict_result_collector.append(results)
 
@@ -116,7 +116,7 @@ class TimesNet(BaseNNClassifier):
         patience: Optional[int] = None,
         training_loss: Union[Criterion, type] = CrossEntropy,
         validation_metric: Union[Criterion, type] = CrossEntropy,
-        optimizer: Optimizer = Adam(),
+        optimizer: Union[Optimizer, type] = Adam,
         num_workers: int = 0,
         device: Optional[Union[str, torch.device, list]] = None,
         saving_path: str = None,
@@ -164,5 +164,9 @@ class TimesNet(BaseNNClassifier):
         self._print_model_size()
 
         # set up the optimizer
-        self.optimizer = optimizer
+        if isinstance(optimizer, Optimizer):
+            self.optimizer = optimizer
+        else:
+            self.optimizer = optimizer()  # instantiate the optimizer if it is a class
+            assert isinstance(self.optimizer, Optimizer)
         self.optimizer.init_optimizer(self.model.parameters())
@@ -8,7 +8,6 @@ the partially-observed time-series clustering task.
 # License: BSD-3-Clause
 
 import os
-from copy import deepcopy
 from typing import Union, Optional
 
 import numpy as np
@@ -228,6 +227,8 @@ class CRLI(BaseNNClusterer):
         else:
             self.best_loss = float("-inf")
 
+        enable_hpo = bool(os.getenv("ENABLE_HPO", False))
+
         try:
             training_step = 0
             epoch_train_loss_G_collector = []
@@ -314,12 +315,12 @@ class CRLI(BaseNNClusterer):
                 ):
                     self.best_epoch = epoch
                     self.best_loss = mean_loss
-                    self.best_model_dict = deepcopy(self.model.state_dict())
+                    self.best_model_dict = self._snapshot_model_dict()
                     self.patience = self.original_patience
                 else:
                     self.patience -= 1
 
-                if os.getenv("ENABLE_HPO", False):
+                if enable_hpo:
                     nni.report_intermediate_result(mean_loss)
                     if epoch == self.epochs - 1 or self.patience == 0:
                         nni.report_final_result(self.best_loss)
@@ -103,6 +103,18 @@ class ModernTCN(BaseNNForecaster):
         The number of subprocesses to use for data loading.
         `0` means data loading will be in the main process, i.e. there won't be subprocesses.
 
+    pin_memory :
+        Whether to put the fetched data tensors into pinned (page-locked) memory, which makes host-to-device copies
+        faster. It only works when the model runs on CUDA devices.
+
+    persistent_workers :
+        Whether to keep the data loading subprocesses alive across epochs instead of re-creating them for each epoch.
+        If not given, it will be True when `num_workers` > 0.
+
+    prefetch_factor :
+        The number of batches loaded in advance by each data loading subprocess.
+        Set it as None to use PyTorch's default. It only works when `num_workers` > 0.
+
     device :
         The device for the model to run on. It can be a string, a :class:`torch.device` object, or a list of them.
         If not given, will try to use CUDA devices first (will use the default CUDA device if there are multiple),
@@ -123,6 +135,14 @@ class ModernTCN(BaseNNForecaster):
         better than in previous epochs.
         The "all" strategy will save every model after each epoch training.
 
+    compile_model :
+        Whether to compile the model with torch.compile() (requires PyTorch>=2.2) to fuse operations and speed up
+        training and inference. Default as False.
+
+    compile_mode :
+        The mode for torch.compile(), e.g. "default", "reduce-overhead", "max-autotune".
+        Only works when `compile_model` is True.
+
     verbose :
         Whether to print out the training logs during the training process.
     """
@@ -152,11 +172,16 @@ class ModernTCN(BaseNNForecaster):
         patience: Optional[int] = None,
         training_loss: Union[Criterion, type] = MSE,
         validation_metric: Union[Criterion, type] = MSE,
-        optimizer: Optimizer = Adam(),
+        optimizer: Union[Optimizer, type] = Adam,
         num_workers: int = 0,
+        pin_memory: bool = True,
+        persistent_workers: Optional[bool] = None,
+        prefetch_factor: Optional[int] = 4,
         device: Optional[Union[str, torch.device, list]] = None,
         saving_path: Optional[str] = None,
         model_saving_strategy: Optional[str] = "best",
+        compile_model: bool = False,
+        compile_mode: str = "default",
         verbose: bool = True,
     ):
         super().__init__(
@@ -166,6 +191,9 @@ class ModernTCN(BaseNNForecaster):
             epochs=epochs,
             patience=patience,
             num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
             device=device,
             saving_path=saving_path,
             model_saving_strategy=model_saving_strategy,
@@ -201,7 +229,13 @@ class ModernTCN(BaseNNForecaster):
         )
         self._print_model_size()
         self._send_model_to_given_device()
+        if compile_model:
+            self._compile_model(mode=compile_mode)
 
         # set up the optimizer
-        self.optimizer = optimizer
+        if isinstance(optimizer, Optimizer):
+            self.optimizer = optimizer
+        else:
+            self.optimizer = optimizer()  # instantiate the optimizer if it is a class
+            assert isinstance(self.optimizer, Optimizer)
         self.optimizer.init_optimizer(self.model.parameters())
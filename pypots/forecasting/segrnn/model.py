@@ -108,7 +108,7 @@ class SegRNN(BaseNNForecaster):
         patience: Optional[int] = None,
         training_loss: Union[Criterion, type] = MSE,
         validation_metric: Union[Criterion, type] = MSE,
-        optimizer: Optimizer = Adam(),
+        optimizer: Union[Optimizer, type] = Adam,
         num_workers: int = 0,
         device: Optional[Union[str, torch.device, list]] = None,
         saving_path: Optional[str] = None,
@@ -152,5 +152,9 @@ class SegRNN(BaseNNForecaster):
         self._send_model_to_given_device()
 
         # set up the optimizer
-        self.optimizer = optimizer
+        if isinstance(optimizer, Optimizer):
+            self.optimizer = optimizer
+        else:
+            self.optimizer = optimizer()  # instantiate the optimizer if it is a class
+            assert isinstance(self.optimizer, Optimizer)
         self.optimizer.init_optimizer(self.model.parameters())
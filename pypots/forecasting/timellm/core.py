@@ -32,6 +32,7 @@ class _TimeLLM(ModelCore):
         domain_prompt_content: str,
         training_loss: Criterion,
         validation_metric: Criterion,
+        use_gradient_checkpointing: bool = False,
     ):
         super().__init__()
 
@@ -61,6 +62,7 @@ class _TimeLLM(ModelCore):
             dropout,
             domain_prompt_content,
             term + "_term_forecast",
+            use_gradient_checkpointing,
         ).float()
 
     def forward(
@@ -6,10 +6,11 @@ The implementation of TimeLLM for the partially-observed time-series forecasting
 # Created by Wenjie Du <wenjay.du@gmail.com>
 # License: BSD-3-Clause
 
-from copy import deepcopy
+import itertools
 from typing import Union, Optional
 
 import torch
+from torch.utils.data import DataLoader
 
 from .core import _TimeLLM
 from ..base import BaseNNForecaster
@@ -96,6 +97,18 @@ class TimeLLM(BaseNNForecaster):
         The number of subprocesses to use for data loading.
         `0` means data loading will be in the main process, i.e. there won't be subprocesses.
 
+    pin_memory :
+        Whether to put the fetched data tensors into pinned (page-locked) memory, which makes host-to-device copies
+        faster. It only works when the model runs on CUDA devices.
+
+    persistent_workers :
+        Whether to keep the data loading subprocesses alive across epochs instead of re-creating them for each epoch.
+        If not given, it will be True when `num_workers` > 0.
+
+    prefetch_factor :
+        The number of batches loaded in advance by each data loading subprocess.
+        Set it as None to use PyTorch's default. It only works when `num_workers` > 0.
+
     device :
         The device for the model to run on. It can be a string, a :class:`torch.device` object, or a list of them.
         If not given, will try to use CUDA devices first (will use the default CUDA device if there are multiple),
@@ -116,6 +129,24 @@ class TimeLLM(BaseNNForecaster):
         better than in previous epochs.
         The "all" strategy will save every model after each epoch training.
 
+    compile_model :
+        Whether to compile the model with torch.compile() (requires PyTorch>=2.2) to fuse operations and speed up
+        training and inference. Default as False.
+
+    compile_mode :
+        The mode for torch.compile(), e.g. "default", "reduce-overhead", "max-autotune".
+        Only works when `compile_model` is True.
+
+    amp_dtype :
+        The dtype for automatic mixed precision (AMP), default as torch.bfloat16 which doesn't need loss scaling and
+        matches the dtype of the released LLaMA weights. Only works when AMP is enabled.
+        On GPUs without native bfloat16 support (older than Ampere), it falls back to torch.float16 with loss scaling.
+
+    use_gradient_checkpointing :
+        Whether to apply gradient checkpointing to the LLM and the reprogramming layer, which recomputes their
+        activations during backward instead of keeping them in memory. It costs more computation but allows larger
+        batch sizes. Default as False.
+
     verbose :
         Whether to print out the training logs during the training process.
     """
@@ -144,9 +175,16 @@ class TimeLLM(BaseNNForecaster):
         validation_metric: Union[Criterion, type] = MSE,
         optimizer: Union[Optimizer, type] = Adam,
         num_workers: int = 0,
+        pin_memory: bool = True,
+        persistent_workers: Optional[bool] = None,
+        prefetch_factor: Optional[int] = 4,
         device: Optional[Union[str, torch.device, list]] = None,
         saving_path: Optional[str] = None,
         model_saving_strategy: Optional[str] = "best",
+        compile_model: bool = False,
+        compile_mode: str = "default",
+        amp_dtype: torch.dtype = torch.bfloat16,
+        use_gradient_checkpointing: bool = False,
         verbose: bool = True,
     ):
         super().__init__(
@@ -156,12 +194,16 @@ class TimeLLM(BaseNNForecaster):
             epochs=epochs,
             patience=patience,
             num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
             device=device,
             enable_amp=True,
             saving_path=saving_path,
             model_saving_strategy=model_saving_strategy,
             verbose=verbose,
         )
+        self._setup_amp_dtype(amp_dtype)
 
         self.n_steps = n_steps
         self.n_features = n_features
@@ -198,9 +240,25 @@ class TimeLLM(BaseNNForecaster):
             domain_prompt_content=self.domain_prompt_content,
             training_loss=self.training_loss,
             validation_metric=self.validation_metric,
+            use_gradient_checkpointing=use_gradient_checkpointing,
         )
+        if self.amp_enabled and self.amp_dtype == torch.bfloat16:
+            # keep the frozen LLM weights in bf16, so the LLM forward under autocast doesn't cast them on every call
+            self.model.backbone.llm_model.to(torch.bfloat16)
         self._print_model_size()
         self._send_model_to_given_device()
+        if compile_model:
+            # only compile the non-LLM submodules, the frozen LLM already runs with its own optimized kernels
+            # and compiling it blows up the warmup time
+            backbone = self.model.module.backbone if isinstance(self.device, list) else self.model.backbone
+            self._compile_model(
+                modules=[
+                    backbone.patch_embedding,
+                    backbone.reprogramming_layer,
+                    backbone.output_projection,
+                ],
+                mode=compile_mode,
+            )
 
         # set up the optimizer
         if isinstance(optimizer, Optimizer):
@@ -208,17 +266,67 @@ class TimeLLM(BaseNNForecaster):
         else:
             self.optimizer = optimizer()  # instantiate the optimizer if it is a class
             assert isinstance(self.optimizer, Optimizer)
-        self.optimizer.init_optimizer(self.model.parameters())
+        # only pass trainable parameters to the optimizer, so it won't keep states for the frozen LLM
+        self.optimizer.init_optimizer([p for p in self.model.parameters() if p.requires_grad])
+
+        # names of the non-LLM entries in the state_dict, the frozen LLM weights are not saved into model files.
+        # LLM tensors are matched by identity rather than by name, because some of them are registered under
+        # non-LLM names as well, e.g. the LLM's input embeddings as backbone.word_embeddings.
+        # This has to be done after the model is moved to the device, since moving replaces the buffer objects.
+        model = self.model.module if isinstance(self.device, list) else self.model
+        llm_model = model.backbone.llm_model
+        llm_tensor_ids = {id(t) for t in itertools.chain(llm_model.parameters(), llm_model.buffers())}
+        self._non_llm_keys = tuple(
+            k for k, v in model.state_dict(keep_vars=True).items() if id(v) not in llm_tensor_ids
+        )
+        # pinned host buffers for saving the non-LLM weights on CUDA, allocated at the first saving and reused after
+        self._save_buffers = None
+
+    def _snapshot_model_dict(self) -> dict:
+        # only snapshot the non-LLM weights, the frozen LLM doesn't change during training
+        prefix = "module." if isinstance(self.device, list) else ""
+        state_dict = self.model.state_dict()
+        return {prefix + k: state_dict[prefix + k].detach().to("cpu", copy=True) for k in self._non_llm_keys}
+
+    def _train_model(
+        self,
+        train_dataloader: DataLoader,
+        val_dataloader: Optional[DataLoader] = None,
+    ) -> None:
+        super()._train_model(train_dataloader, val_dataloader)
+        # merge the snapshot of the non-LLM weights into the current state_dict so that it can be loaded as a whole,
+        # the LLM entries in it are only references to the frozen weights and don't take extra memory
+        best_model_dict = self.model.state_dict()
+        best_model_dict.update(self.best_model_dict)
+        self.best_model_dict = best_model_dict
 
     def _organize_content_to_save(self):
         from ...version import __version__ as pypots_version
 
         if isinstance(self.device, list):
             # to save a DataParallel model generically, save the model.module.state_dict()
-            model_state_dict = deepcopy(self.model.module.state_dict())
+            state_dict = self.model.module.state_dict()
+        else:
+            state_dict = self.model.state_dict()
+        # only copy the non-LLM weights, so we don't materialize a copy of the whole LLM
+        device = self.device[0] if isinstance(self.device, list) else self.device
+        if device.type == "cuda":
+            if self._save_buffers is None:
+                self._save_buffers = {
+                    k: torch.empty(state_dict[k].shape, dtype=state_dict[k].dtype, pin_memory=True)
+                    for k in self._non_llm_keys
+                }
+            # copy asynchronously into the pinned buffers on a side stream,
+            # which waits for the pending work on the current stream to finish first
+            stream = torch.cuda.Stream(device=device)
+            stream.wait_stream(torch.cuda.current_stream(device))
+            with torch.cuda.stream(stream):
+                for k, buffer in self._save_buffers.items():
+                    buffer.copy_(state_dict[k].detach(), non_blocking=True)
+            stream.synchronize()
+            model_state_dict = dict(self._save_buffers)
         else:
-            model_state_dict = deepcopy(self.model.state_dict())
-        model_state_dict = {k: v for k, v in model_state_dict.items() if "llm" not in k}
+            model_state_dict = {k: state_dict[k].detach().cpu().clone() for k in self._non_llm_keys}
 
         all_attrs = dict({})
         all_attrs["model_state_dict"] = model_state_dict
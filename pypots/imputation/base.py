@@ -191,6 +191,18 @@ class BaseNNImputer(BaseNNModel):
         The number of subprocesses to use for data loading.
         `0` means data loading will be in the main process, i.e. there won't be subprocesses.
 
+    pin_memory :
+        Whether to put the fetched data tensors into pinned (page-locked) memory before returning them, which makes
+        host-to-device copies faster. It only works when the model runs on CUDA devices.
+
+    persistent_workers :
+        Whether to keep the data loading subprocesses alive across epochs instead of re-creating them for each epoch.
+        If given as None, it will be True when `num_workers` > 0. It only works when `num_workers` > 0.
+
+    prefetch_factor :
+        The number of batches loaded in advance by each data loading subprocess.
+        If not given, PyTorch's default will be used. It only works when `num_workers` > 0.
+
     device :
         The device for the model to run on. It can be a string, a :class:`torch.device` object, or a list of them.
         If not given, will try to use CUDA devices first (will use the default CUDA device if there are multiple),
@@ -235,6 +247,9 @@ class BaseNNImputer(BaseNNModel):
         epochs: int,
         patience: Optional[int] = None,
         num_workers: int = 0,
+        pin_memory: bool = False,
+        persistent_workers: Optional[bool] = False,
+        prefetch_factor: Optional[int] = None,
         device: Optional[Union[str, torch.device, list]] = None,
         enable_amp: bool = False,
         saving_path: str = None,
@@ -248,6 +263,9 @@ class BaseNNImputer(BaseNNModel):
             epochs=epochs,
             patience=patience,
             num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
+            prefetch_factor=prefetch_factor,
             device=device,
             enable_amp=enable_amp,
             saving_path=saving_path,
@@ -337,7 +355,7 @@ class BaseNNImputer(BaseNNModel):
         dict_result_collector = []
         for idx, data in enumerate(test_dataloader):
             inputs = self._assemble_input_for_testing(data)
-            with autocast(enabled=self.amp_enabled):
+            with autocast(enabled=self.amp_enabled, dtype=self.amp_dtype):
                 results = self.model(inputs, **kwargs)
             dict_result_collector.append(results)
 
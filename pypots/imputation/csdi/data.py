@@ -120,11 +120,13 @@ class DatasetForCSDI(BaseDataset):
             else torch.from_numpy(self.data["time_points"][idx]).to(torch.float32)
         )
 
+        # samples are returned in the channels-first layout [n_features, n_steps] that CSDI works with,
+        # so the permutation is done once here in the data loading workers rather than on every batch on device
         sample = [
             torch.tensor(idx),
-            observed_data,
-            indicating_mask,
-            cond_mask,
+            observed_data.transpose(0, 1).contiguous(),
+            indicating_mask.transpose(0, 1).contiguous(),
+            cond_mask.transpose(0, 1).contiguous(),
             observed_tp,
         ]
 
@@ -194,11 +196,13 @@ class DatasetForCSDI(BaseDataset):
             else torch.from_numpy(self.file_handle["time_points"][idx]).to(torch.float32)
         )
 
+        # samples are returned in the channels-first layout [n_features, n_steps] that CSDI works with,
+        # so the permutation is done once here in the data loading workers rather than on every batch on device
         sample = [
             torch.tensor(idx),
-            observed_data,
-            indicating_mask,
-            cond_mask,
+            observed_data.transpose(0, 1).contiguous(),
+            indicating_mask.transpose(0, 1).contiguous(),
+            cond_mask.transpose(0, 1).contiguous(),
             observed_tp,
         ]
 
@@ -255,10 +259,11 @@ class TestDatasetForCSDI(DatasetForCSDI):
             else torch.from_numpy(self.data["time_points"][idx]).to(torch.float32)
         )
 
+        # samples are returned in the channels-first layout [n_features, n_steps] that CSDI works with
         sample = [
             torch.tensor(idx),
-            observed_data,
-            cond_mask,
+            observed_data.transpose(0, 1).contiguous(),
+            cond_mask.transpose(0, 1).contiguous(),
             observed_tp,
         ]
 
@@ -308,10 +313,11 @@ class TestDatasetForCSDI(DatasetForCSDI):
             else torch.from_numpy(self.file_handle["time_points"][idx]).to(torch.float32)
         )
 
+        # samples are returned in the channels-first layout [n_features, n_steps] that CSDI works with
         sample = [
             torch.tensor(idx),
-            observed_data,
-            cond_mask,
+            observed_data.transpose(0, 1).contiguous(),
+            cond_mask.transpose(0, 1).contiguous(),
             observed_tp,
         ]
 
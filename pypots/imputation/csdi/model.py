@@ -6,6 +6,7 @@ The implementation of CSDI for the partially-observed time-series imputation tas
 # Created by Wenjie Du <wenjay.du@gmail.com>
 # License: BSD-3-Clause
 
+import math
 from typing import Union, Optional
 
 import numpy as np
@@ -16,7 +17,6 @@ from .core import _CSDI
 from .data import DatasetForCSDI, TestDatasetForCSDI
 from ..base import BaseNNImputer
 from ...data.checking import key_in_data_set
-from ...nn.functional import gather_listed_dicts
 from ...nn.modules.loss import Criterion
 from ...optim.adam import Adam
 from ...optim.base import Optimizer
@@ -88,6 +88,14 @@ class CSDI(BaseNNImputer):
         The number of subprocesses to use for data loading.
         `0` means data loading will be in the main process, i.e. there won't be subprocesses.
 
+    pin_memory :
+        Whether to put the fetched data tensors into pinned (page-locked) memory, which makes host-to-device copies
+        faster. It only works when the model runs on CUDA devices.
+
+    persistent_workers :
+        Whether to keep the data loading subprocesses alive across epochs instead of re-creating them for each epoch.
+        If not given, it will be True when `num_workers` > 0.
+
     device :
         The device for the model to run on. It can be a string, a :class:`torch.device` object, or a list of them.
         If not given, will try to use CUDA devices first (will use the default CUDA device if there are multiple),
@@ -108,6 +116,35 @@ class CSDI(BaseNNImputer):
         better than in previous epochs.
         The "all" strategy will save every model after each epoch training.
 
+    compile_model :
+        Whether to compile the diffusion network of CSDI with torch.compile() (requires PyTorch>=2.2), which is
+        invoked at every diffusion step, to fuse operations and cut the kernel launching overhead. Default as False.
+
+    compile_mode :
+        The mode for torch.compile(), e.g. "default", "reduce-overhead", "max-autotune".
+        Only works when `compile_model` is True.
+
+    use_amp :
+        Whether to allow automatic mixed precision (AMP) training for this model.
+        AMP is only applied when the environment variable `ENABLE_AMP` is set and CUDA is available.
+        Set it to False to keep CSDI training in full precision regardless.
+
+    amp_dtype :
+        The dtype for automatic mixed precision (AMP) training, default as torch.bfloat16 which doesn't need loss
+        scaling. Only works when AMP is enabled. The sampling process in predict() always runs in full precision.
+        On GPUs without native bfloat16 support (older than Ampere), it falls back to torch.float16 with loss scaling.
+
+    cudnn_benchmark :
+        Whether to set `torch.backends.cudnn.benchmark` to True, letting cuDNN autotune the fastest kernels for the
+        static input shape of training batches. Note that it's a global setting of PyTorch.
+
+    fused_sampling :
+        Whether to draw the `n_sampling_times` samples in predict() by replicating the batch `n_sampling_times`
+        times and running the reverse diffusion over the replicated rows in chunks of at most `batch_size` rows,
+        rather than running the reverse diffusion `n_sampling_times` times sequentially on the batch.
+        It keeps the GPU busy with full batches when the test batches are small, and only gets applied to the batches
+        for which it takes fewer passes than the sequential sampling.
+
     verbose :
         Whether to print out the training logs during the training process.
     """
@@ -133,9 +170,17 @@ class CSDI(BaseNNImputer):
         patience: Optional[int] = None,
         optimizer: Union[Optimizer, type] = Adam,
         num_workers: int = 0,
+        pin_memory: bool = True,
+        persistent_workers: Optional[bool] = None,
         device: Optional[Union[str, torch.device, list]] = None,
         saving_path: Optional[str] = None,
         model_saving_strategy: Optional[str] = "best",
+        compile_model: bool = False,
+        compile_mode: str = "reduce-overhead",
+        use_amp: bool = True,
+        amp_dtype: torch.dtype = torch.bfloat16,
+        cudnn_benchmark: bool = False,
+        fused_sampling: bool = True,
         verbose: bool = True,
     ):
         super().__init__(
@@ -145,15 +190,22 @@ class CSDI(BaseNNImputer):
             epochs=epochs,
             patience=patience,
             num_workers=num_workers,
+            pin_memory=pin_memory,
+            persistent_workers=persistent_workers,
             device=device,
+            enable_amp=use_amp,
             saving_path=saving_path,
             model_saving_strategy=model_saving_strategy,
             verbose=verbose,
         )
+        self._setup_amp_dtype(amp_dtype)
         assert target_strategy in ["mix", "random"]
         assert schedule in ["quad", "linear"]
         self.n_steps = n_steps
         self.target_strategy = target_strategy
+        self.fused_sampling = fused_sampling
+        if cudnn_benchmark:
+            torch.backends.cudnn.benchmark = True
 
         # set up the model
         self.model = _CSDI(
@@ -172,6 +224,11 @@ class CSDI(BaseNNImputer):
         )
         self._print_model_size()
         self._send_model_to_given_device()
+        if compile_model:
+            # only compile the diffusion network, the reverse diffusion sampling is a Python loop over all steps
+            # which would be unrolled into a huge graph if compiling the whole model
+            model = self.model.module if isinstance(self.device, list) else self.model
+            self._compile_model(modules=[model.backbone.diff_model], mode=compile_mode)
 
         # set up the optimizer
         if isinstance(optimizer, Optimizer):
@@ -190,10 +247,11 @@ class CSDI(BaseNNImputer):
             observed_tp,
         ) = self._send_data_to_given_device(data)
 
+        # data from DatasetForCSDI is already in the shape of [batch_size, n_features, n_steps]
         inputs = {
-            "X_ori": X_ori.permute(0, 2, 1),  # ori observed part for model hint
-            "indicating_mask": indicating_mask.permute(0, 2, 1),  # for loss calc
-            "cond_mask": cond_mask.permute(0, 2, 1),  # for masking X_ori
+            "X_ori": X_ori,  # ori observed part for model hint
+            "indicating_mask": indicating_mask,  # for loss calc
+            "cond_mask": cond_mask,  # for masking X_ori
             "observed_tp": observed_tp,
         }
         return inputs
@@ -201,7 +259,7 @@ class CSDI(BaseNNImputer):
     def _assemble_input_for_validating(self, data: list) -> dict:
         return self._assemble_input_for_training(data)
 
-    def _assemble_input_for_testing(self, data: list) -> dict:
+    def _assemble_input_for_testing(self, data: list, n_sampling_times: int = 1) -> dict:
         (
             indices,
             X,
@@ -209,9 +267,16 @@ class CSDI(BaseNNImputer):
             observed_tp,
         ) = self._send_data_to_given_device(data)
 
+        if n_sampling_times > 1:
+            # replicate each sample n_sampling_times times in a row, so that all samplings can be done in one pass
+            X = X.repeat_interleave(n_sampling_times, dim=0)
+            cond_mask = cond_mask.repeat_interleave(n_sampling_times, dim=0)
+            observed_tp = observed_tp.repeat_interleave(n_sampling_times, dim=0)
+
+        # data from TestDatasetForCSDI is already in the shape of [batch_size, n_features, n_steps]
         inputs = {
-            "X": X.permute(0, 2, 1),  # for model input
-            "cond_mask": cond_mask.permute(0, 2, 1),  # missing mask
+            "X": X,  # for model input
+            "cond_mask": cond_mask,  # missing mask
             "observed_tp": observed_tp,
         }
         return inputs
@@ -234,7 +299,10 @@ class CSDI(BaseNNImputer):
             train_dataset,
             batch_size=self.batch_size,
             shuffle=True,
-            num_workers=self.num_workers,
+            # keep the input shape static, otherwise the last incomplete batch triggers recompiling of the compiled
+            # model and re-autotuning of cuDNN every epoch. Only keep it if the dataset can't fill one batch.
+            drop_last=len(train_dataset) >= self.batch_size,
+            **self._get_dataloader_kwargs(),
         )
         val_dataloader = None
         if val_set is not None:
@@ -250,7 +318,7 @@ class CSDI(BaseNNImputer):
                 val_dataset,
                 batch_size=self.batch_size,
                 shuffle=False,
-                num_workers=self.num_workers,
+                **self._get_dataloader_kwargs(),
             )
 
         # Step 2: train the model and freeze it
@@ -260,7 +328,7 @@ class CSDI(BaseNNImputer):
         # Step 3: save the model if necessary
         self._auto_save_model_if_necessary(confirm_saving=self.model_saving_strategy == "best")
 
-    @torch.no_grad()
+    @torch.inference_mode()
     def predict(
         self,
         test_set: Union[dict, str],
@@ -301,21 +369,85 @@ class CSDI(BaseNNImputer):
             test_dataset,
             batch_size=self.batch_size,
             shuffle=False,
-            num_workers=self.num_workers,
+            **self._get_dataloader_kwargs(),
         )
 
         # Step 2: process the data with the model
-        dict_result_collector = []
+        # results of each batch are copied into the host output arrays right after being produced,
+        # rather than being kept on device till all batches are done and then concatenated
+        device = self.device[0] if isinstance(self.device, list) else self.device
+        on_cuda = device.type == "cuda"
+        copy_stream = torch.cuda.Stream(device) if on_cuda else None
+        n_samples = len(test_dataset)
+        result_dict = {}
+
+        def collect(host_results: dict, offset: int, batch_size: int) -> None:
+            for key, value in host_results.items():
+                if key not in result_dict:
+                    result_dict[key] = np.empty((n_samples, *value.shape[1:]), dtype=value.dtype)
+                result_dict[key][offset : offset + batch_size] = value[:batch_size]
+
+        # on CUDA, each batch goes through small pinned staging buffers, only one batch large, so that the
+        # device-to-host copy can be asynchronous without holding page-locked memory for the whole output
+        staging_buffers = None
+        pending = None  # (offset, batch_size) of the batch being copied into the staging buffers
+        offset = 0
         for idx, data in enumerate(test_dataloader):
-            inputs = self._assemble_input_for_testing(data)
-            results = self.model(
-                inputs,
-                n_sampling_times=n_sampling_times,
-            )
-            dict_result_collector.append(results)
+            # only take the fused sampling when it needs fewer passes than the sequential one, e.g. for small batches,
+            # otherwise it runs the same number of passes with extra overheads of replicating and concatenating
+            n_fused_passes = math.ceil(len(data[0]) * n_sampling_times / self.batch_size)
+            if self.fused_sampling and n_fused_passes < n_sampling_times:
+                inputs = self._assemble_input_for_testing(data, n_sampling_times=n_sampling_times)
+                # process the replicated rows in chunks of at most batch_size rows,
+                # so that the fused sampling doesn't take more memory than a regular batch
+                n_rows = inputs["X"].shape[0]
+                chunk_results = [
+                    self.model(
+                        {key: value[i : i + self.batch_size] for key, value in inputs.items()},
+                        n_sampling_times=1,
+                    )
+                    for i in range(0, n_rows, self.batch_size)
+                ]
+                # [batch_size * n_sampling_times, 1, ...] -> [batch_size, n_sampling_times, ...]
+                results = {}
+                for key in chunk_results[0].keys():
+                    value = torch.cat([chunk_result[key] for chunk_result in chunk_results])
+                    results[key] = value.reshape(-1, n_sampling_times, *value.shape[2:])
+            else:
+                inputs = self._assemble_input_for_testing(data)
+                results = self.model(
+                    inputs,
+                    n_sampling_times=n_sampling_times,
+                )
+            batch_size = results["imputation"].shape[0]
+
+            if on_cuda:
+                if staging_buffers is None:
+                    staging_buffers = {
+                        key: torch.empty((self.batch_size, *value.shape[1:]), dtype=value.dtype, pin_memory=True)
+                        for key, value in results.items()
+                    }
+                else:
+                    # the staging buffers are going to be reused, wait for the copies of the previous batch
+                    copy_stream.synchronize()
+                    collect({key: value.numpy() for key, value in staging_buffers.items()}, *pending)
+                # copy on the side stream to overlap the device-to-host transfer with the next batch's sampling,
+                # it has to wait for the sampling of this batch to finish on the current stream first
+                copy_stream.wait_stream(torch.cuda.current_stream(device))
+                with torch.cuda.stream(copy_stream):
+                    for key, value in results.items():
+                        staging_buffers[key][:batch_size].copy_(value, non_blocking=True)
+                        # keep the allocator from reusing the memory of value before the copy is done
+                        value.record_stream(copy_stream)
+                pending = (offset, batch_size)
+            else:
+                collect({key: value.numpy() for key, value in results.items()}, offset, batch_size)
+            offset += batch_size
 
         # Step 3: output collection and return
-        result_dict = gather_listed_dicts(dict_result_collector)
+        if pending is not None:
+            copy_stream.synchronize()  # wait for the copies of the last batch
+            collect({key: value.numpy() for key, value in staging_buffers.items()}, *pending)
 
         return result_dict
 
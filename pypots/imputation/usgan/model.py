@@ -7,7 +7,6 @@ The implementation of USGAN for the partially-observed time-series imputation ta
 # License: BSD-3-Clause
 
 import os
-from copy import deepcopy
 from typing import Union, Optional
 
 import numpy as np
@@ -253,6 +252,8 @@ class USGAN(BaseNNImputer):
         else:
             self.best_loss = float("-inf")
 
+        enable_hpo = bool(os.getenv("ENABLE_HPO", False))
+
         try:
             training_step = 0
             for epoch in range(1, self.epochs + 1):
@@ -343,7 +344,7 @@ class USGAN(BaseNNImputer):
                 ):
                     self.best_epoch = epoch
                     self.best_loss = mean_loss
-                    self.best_model_dict = deepcopy(self.model.state_dict())
+                    self.best_model_dict = self._snapshot_model_dict()
                     self.patience = self.original_patience
                 else:
                     self.patience -= 1
@@ -354,7 +355,7 @@ class USGAN(BaseNNImputer):
                     saving_name=f"{self.__class__.__name__}_epoch{epoch}_{self.validation_metric_name}{mean_loss:.4f}",
                 )
 
-                if os.getenv("ENABLE_HPO", False):
+                if enable_hpo:
                     nni.report_intermediate_result(mean_loss)
                     if epoch == self.epochs - 1 or self.patience == 0:
                         nni.report_final_result(self.best_loss)
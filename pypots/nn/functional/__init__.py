@@ -23,7 +23,7 @@ from .clustering import (
     calc_internal_cluster_validation_metrics,
     calc_external_cluster_validation_metrics,
 )
-from .cuda import autocast
+from .cuda import autocast, grad_scaler
 from .error import (
     calc_mae,
     calc_mse,
@@ -38,6 +38,7 @@ from .normalization import nonstationary_norm, nonstationary_denorm
 __all__ = [
     # cuda functions
     "autocast",
+    "grad_scaler",
     # gathering functions
     "gather_listed_dicts",
     # normalization functions
@@ -19,3 +19,18 @@ def autocast(**kwargs):
         from torch.amp import autocast
 
         return autocast("cuda", **kwargs)
+
+
+# overwrite GradScaler to make it compatible with all torch versions,
+# torch.amp.GradScaler is only available since torch 2.3 and torch.cuda.amp.GradScaler is deprecated since torch 2.4
+try:
+    from torch.amp import GradScaler
+
+    def grad_scaler(**kwargs) -> GradScaler:
+        return GradScaler("cuda", **kwargs)
+
+except ImportError:
+    from torch.cuda.amp import GradScaler
+
+    def grad_scaler(**kwargs) -> GradScaler:
+        return GradScaler(**kwargs)
@@ -52,6 +52,19 @@ def _check_inputs(
     return lib
 
 
+def _apply_masks(
+    errors: Union[np.ndarray, torch.Tensor],
+    masks: Union[np.ndarray, torch.Tensor],
+) -> Union[np.ndarray, torch.Tensor]:
+    # errors here is always a temporary result computed from the inputs, so mask it in place to save one allocation
+    # if no dtype promotion is needed. It's safe for autograd as well, because the backward of square() and abs()
+    # depends on their inputs rather than outputs.
+    if errors.dtype == masks.dtype:
+        errors *= masks
+        return errors
+    return errors * masks
+
+
 def calc_mae(
     predictions: Union[np.ndarray, torch.Tensor],
     targets: Union[np.ndarray, torch.Tensor],
@@ -98,7 +111,7 @@ def calc_mae(
     lib = _check_inputs(predictions, targets, masks)
 
     if masks is not None:
-        return lib.sum(lib.abs(predictions - targets) * masks) / (lib.sum(masks) + 1e-12)
+        return lib.sum(_apply_masks(lib.abs(predictions - targets), masks)) / (lib.sum(masks) + 1e-12)
     else:
         return lib.mean(lib.abs(predictions - targets))
 
@@ -149,7 +162,7 @@ def calc_mse(
     lib = _check_inputs(predictions, targets, masks)
 
     if masks is not None:
-        return lib.sum(lib.square(predictions - targets) * masks) / (lib.sum(masks) + 1e-12)
+        return lib.sum(_apply_masks(lib.square(predictions - targets), masks)) / (lib.sum(masks) + 1e-12)
     else:
         return lib.mean(lib.square(predictions - targets))
 
@@ -197,9 +210,14 @@ def calc_rmse(
     so the result is :math:`\\sqrt{1/2}=0.5`.
 
     """
-    # don't have to check types and NaN here, since calc_mse() will do it
-    lib = np if isinstance(predictions, np.ndarray) else torch
-    return lib.sqrt(calc_mse(predictions, targets, masks))
+    # check shapes and values of inputs
+    lib = _check_inputs(predictions, targets, masks)
+
+    # calculate it directly rather than taking sqrt of calc_mse(), to save the intermediate call
+    if masks is not None:
+        return lib.sqrt(lib.sum(_apply_masks(lib.square(predictions - targets), masks)) / (lib.sum(masks) + 1e-12))
+    else:
+        return lib.sqrt(lib.mean(lib.square(predictions - targets)))
 
 
 def calc_mre(
@@ -249,7 +267,9 @@ def calc_mre(
     lib = _check_inputs(predictions, targets, masks)
 
     if masks is not None:
-        return lib.sum(lib.abs(predictions - targets) * masks) / (lib.sum(lib.abs(targets * masks)) + 1e-12)
+        return lib.sum(_apply_masks(lib.abs(predictions - targets), masks)) / (
+            lib.sum(_apply_masks(lib.abs(targets), masks)) + 1e-12
+        )
     else:
         return lib.sum(lib.abs(predictions - targets)) / (lib.sum(lib.abs(targets)) + 1e-12)
 
@@ -266,6 +286,27 @@ def calc_quantile_loss(
     return quantile_loss
 
 
+def _calc_quantiles(
+    predictions: torch.Tensor,
+    quantiles: torch.Tensor,
+) -> torch.Tensor:
+    """Calculate the given quantiles of ``predictions`` along the dimension 1 all at once. It is equivalent to
+    ``torch.quantile(predictions, quantiles, dim=1).transpose(0, 1)`` with the default linear interpolation,
+    but doesn't suffer from the input size limit of torch.quantile().
+    """
+    sorted_predictions = torch.sort(predictions, dim=1).values
+    positions = quantiles * (predictions.shape[1] - 1)
+    lower_indices = torch.floor(positions).long()
+    upper_indices = torch.ceil(positions).long()
+    weights = (positions - lower_indices).view(1, -1, *([1] * (predictions.dim() - 2)))
+    q_pred = torch.lerp(
+        sorted_predictions.index_select(1, lower_indices),
+        sorted_predictions.index_select(1, upper_indices),
+        weights,
+    )  # [n_samples, n_quantiles, ...]
+    return q_pred
+
+
 def calc_quantile_crps(
     predictions: Union[np.ndarray, torch.Tensor],
     targets: Union[np.ndarray, torch.Tensor],
@@ -312,16 +353,17 @@ def calc_quantile_crps(
     targets = targets * scaler_stddev + scaler_mean
     predictions = predictions * scaler_stddev + scaler_mean
 
-    quantiles = np.arange(0.05, 1.0, 0.05)
+    # calculate the losses of all quantiles at once rather than looping over them
+    quantiles = torch.from_numpy(np.arange(0.05, 1.0, 0.05)).to(predictions)
     denominator = torch.sum(torch.abs(targets * masks))
-    CRPS = torch.tensor(0.0)
-    for i in range(len(quantiles)):
-        q_pred = []
-        for j in range(len(predictions)):
-            q_pred.append(torch.quantile(predictions[j : j + 1], quantiles[i], dim=1))
-        q_pred = torch.cat(q_pred, 0)
-        q_loss = calc_quantile_loss(q_pred, targets, quantiles[i], masks)
-        CRPS += q_loss / denominator
+    q_pred = _calc_quantiles(predictions, quantiles)
+    q_loss = calc_quantile_loss(
+        q_pred,
+        targets.unsqueeze(1),
+        quantiles.view(1, -1, *([1] * (targets.dim() - 1))),
+        masks.unsqueeze(1),
+    )
+    CRPS = q_loss / denominator
     return CRPS.item() / len(quantiles)
 
 
@@ -373,11 +415,15 @@ def calc_quantile_crps_sum(
     targets = targets.sum(-1)
     predictions = predictions * scaler_stddev + scaler_mean
 
-    quantiles = np.arange(0.05, 1.0, 0.05)
+    # calculate the losses of all quantiles at once rather than looping over them
+    quantiles = torch.from_numpy(np.arange(0.05, 1.0, 0.05)).to(predictions)
     denominator = torch.sum(torch.abs(targets * masks))
-    CRPS = torch.tensor(0.0)
-    for i in range(len(quantiles)):
-        q_pred = torch.quantile(predictions.sum(-1), quantiles[i], dim=1)
-        q_loss = calc_quantile_loss(q_pred, targets, quantiles[i], masks)
-        CRPS += q_loss / denominator
+    q_pred = _calc_quantiles(predictions.sum(-1), quantiles)
+    q_loss = calc_quantile_loss(
+        q_pred,
+        targets.unsqueeze(1),
+        quantiles.view(1, -1, *([1] * (targets.dim() - 1))),
+        masks.unsqueeze(1),
+    )
+    CRPS = q_loss / denominator
     return CRPS.item() / len(quantiles)
@@ -86,10 +86,11 @@ class BackboneCSDI(nn.Module):
     def calc_loss(self, observed_data, cond_mask, indicating_mask, side_info, set_t=-1):
         B, K, L = observed_data.shape
         device = observed_data.device
+        # create diffusion steps directly on the device rather than creating them on CPU and copying them over
         if self.training != 1:  # for validation
-            t = (torch.ones(B) * set_t).long().to(device)
+            t = torch.full((B,), set_t, dtype=torch.long, device=device)
         else:
-            t = torch.randint(0, self.n_diffusion_steps, [B]).to(device)
+            t = torch.randint(0, self.n_diffusion_steps, [B], device=device)
 
         current_alpha = self.alpha_torch[t]  # (B,1,1)
         noise = torch.randn_like(observed_data)
@@ -108,7 +109,10 @@ class BackboneCSDI(nn.Module):
     def forward(self, observed_data, cond_mask, side_info, n_sampling_times):
         B, K, L = observed_data.shape
         device = observed_data.device
-        imputed_samples = torch.zeros(B, n_sampling_times, K, L).to(device)
+        imputed_samples = torch.zeros(B, n_sampling_times, K, L, device=device)
+
+        # all diffusion steps are created on the device once here, instead of being copied over at every step
+        diffusion_steps = torch.arange(self.n_diffusion_steps, device=device).unsqueeze(-1)
 
         for i in range(n_sampling_times):
             # generate noisy observation for unconditional model
@@ -130,7 +134,7 @@ class BackboneCSDI(nn.Module):
                     cond_obs = (cond_mask * observed_data).unsqueeze(1)
                     noisy_target = ((1 - cond_mask) * current_sample).unsqueeze(1)
                     diff_input = torch.cat([cond_obs, noisy_target], dim=1)  # (B,2,K,L)
-                predicted = self.diff_model(diff_input, side_info, torch.tensor([t]).to(device))
+                predicted = self.diff_model(diff_input, side_info, diffusion_steps[t])
 
                 coeff1 = 1 / self.alpha_hat[t] ** 0.5
                 coeff2 = (1 - self.alpha_hat[t]) / (1 - self.alpha[t]) ** 0.5
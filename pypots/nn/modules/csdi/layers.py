@@ -13,7 +13,15 @@ import torch.nn.functional as F
 
 
 def get_torch_trans(heads=8, layers=1, channels=64):
-    encoder_layer = nn.TransformerEncoderLayer(d_model=channels, nhead=heads, dim_feedforward=64, activation="gelu")
+    # batch_first layout lets the residual block feed the transformer with a single permute,
+    # and is required by PyTorch's fused fast path of TransformerEncoderLayer in inference
+    encoder_layer = nn.TransformerEncoderLayer(
+        d_model=channels,
+        nhead=heads,
+        dim_feedforward=64,
+        activation="gelu",
+        batch_first=True,
+    )
     return nn.TransformerEncoder(encoder_layer, num_layers=layers)
 
 
@@ -68,18 +76,18 @@ class CsdiResidualBlock(nn.Module):
         B, channel, K, L = base_shape  # bz, 2, n_features, n_steps
         if L == 1:
             return y
-        y = y.reshape(B, channel, K, L).permute(0, 2, 1, 3).reshape(B * K, channel, L)
-        y = self.time_layer(y.permute(2, 0, 1)).permute(1, 2, 0)
-        y = y.reshape(B, K, channel, L).permute(0, 2, 1, 3).reshape(B, channel, K * L)
+        y = y.reshape(B, channel, K, L).permute(0, 2, 3, 1).reshape(B * K, L, channel)
+        y = self.time_layer(y)
+        y = y.reshape(B, K, L, channel).permute(0, 3, 1, 2).reshape(B, channel, K * L)
         return y
 
     def forward_feature(self, y, base_shape):
         B, channel, K, L = base_shape  # bz, 2, n_features, n_steps
         if K == 1:
             return y
-        y = y.reshape(B, channel, K, L).permute(0, 3, 1, 2).reshape(B * L, channel, K)
-        y = self.feature_layer(y.permute(2, 0, 1)).permute(1, 2, 0)
-        y = y.reshape(B, L, channel, K).permute(0, 2, 3, 1).reshape(B, channel, K * L)
+        y = y.reshape(B, channel, K, L).permute(0, 3, 2, 1).reshape(B * L, K, channel)
+        y = self.feature_layer(y)
+        y = y.reshape(B, L, K, channel).permute(0, 3, 2, 1).reshape(B, channel, K * L)
         return y
 
     def forward(self, x, cond_info, diffusion_emb):
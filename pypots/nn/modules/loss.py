@@ -111,26 +111,60 @@ class MRE(Criterion):
 
 
 class CrossEntropy(Criterion):
-    def __init__(self):
+    def __init__(
+        self,
+        ignore_index: int = -100,
+        label_smoothing: float = 0.0,
+    ):
+        """The cross entropy loss between the predicted unnormalized logits and the integer class targets.
+
+        Parameters
+        ----------
+        ignore_index :
+            The target value that is ignored and doesn't contribute to the loss.
+
+        label_smoothing :
+            The amount of smoothing when computing the loss, should be in [0.0, 1.0], where 0.0 means no smoothing.
+
+        """
         super().__init__()
+        self.ignore_index = ignore_index
+        self.label_smoothing = label_smoothing
 
     def forward(
         self,
         logits: torch.Tensor,
         targets: torch.Tensor,
     ) -> torch.Tensor:
-        value = torch.nn.functional.cross_entropy(logits, targets)
+        value = torch.nn.functional.cross_entropy(
+            logits,
+            targets,
+            ignore_index=self.ignore_index,
+            label_smoothing=self.label_smoothing,
+        )
         return value
 
 
 class NLL(Criterion):
-    def __init__(self):
+    def __init__(
+        self,
+        ignore_index: int = -100,
+    ):
+        """The negative log likelihood loss between the predicted log-probabilities and the integer class targets.
+
+        Parameters
+        ----------
+        ignore_index :
+            The target value that is ignored and doesn't contribute to the loss.
+
+        """
         super().__init__()
+        self.ignore_index = ignore_index
 
     def forward(
         self,
         log_probs: torch.Tensor,
         targets: torch.Tensor,
     ) -> torch.Tensor:
-        value = torch.nn.functional.nll_loss(log_probs, targets)
+        value = torch.nn.functional.nll_loss(log_probs, targets, ignore_index=self.ignore_index)
         return value
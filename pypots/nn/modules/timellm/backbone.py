@@ -9,6 +9,7 @@ import os
 
 import torch
 import torch.nn as nn
+from torch.utils.checkpoint import checkpoint
 from transformers import (
     LlamaModel,
     LlamaTokenizer,
@@ -54,6 +55,7 @@ class BackboneTimeLLM(nn.Module):
         dropout,
         domain_prompt_content: str,
         task_name: str,
+        use_gradient_checkpointing: bool = False,
     ):
         super().__init__()
         self.n_features = n_features
@@ -65,6 +67,7 @@ class BackboneTimeLLM(nn.Module):
         self.patch_stride = patch_stride
         self.task_name = task_name
         self.top_k = 5  # fixed value, the same as the official implementation
+        self.use_gradient_checkpointing = use_gradient_checkpointing
 
         assert n_steps > patch_size, "The length of the time series must be greater than the patch length."
         assert llm_model_type in SUPPORTED_LLM, f"The LLM model type must be one of {SUPPORTED_LLM}."
@@ -111,6 +114,11 @@ class BackboneTimeLLM(nn.Module):
         for param in self.llm_model.parameters():
             param.requires_grad = False
 
+        if self.use_gradient_checkpointing:
+            # trade recomputation for memory, activations inside the LLM won't be kept for backward
+            self.llm_model.gradient_checkpointing_enable()
+            self.llm_model.config.use_cache = False
+
         self.patch_embedding = PatchEmbedding(
             d_model,
             patch_size,
@@ -213,7 +221,16 @@ class BackboneTimeLLM(nn.Module):
             enc_out = self.patch_embedding(x_enc.to(torch.bfloat16))
         else:
             enc_out = self.patch_embedding(x_enc)
-        enc_out = self.reprogramming_layer(enc_out, source_embeddings, source_embeddings)
+        if self.use_gradient_checkpointing and self.training:
+            enc_out = checkpoint(
+                self.reprogramming_layer,
+                enc_out,
+                source_embeddings,
+                source_embeddings,
+                use_reentrant=False,
+            )
+        else:
+            enc_out = self.reprogramming_layer(enc_out, source_embeddings, source_embeddings)
 
         llama_enc_out = torch.cat([prompt_embeddings, enc_out], dim=1)
         dec_out = self.llm_model(inputs_embeds=llama_enc_out).last_hidden_state
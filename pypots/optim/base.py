@@ -21,6 +21,7 @@ from abc import ABC, abstractmethod
 from typing import Callable, Iterable, Optional
 
 from .lr_scheduler.base import LRScheduler
+from ..nn.functional.cuda import GradScaler
 
 
 class Optimizer(ABC):
@@ -92,7 +93,7 @@ class Optimizer(ABC):
         state_dict = self.torch_optimizer.state_dict()
         return state_dict
 
-    def step(self, closure: Optional[Callable] = None) -> None:
+    def step(self, closure: Optional[Callable] = None, grad_scaler: Optional[GradScaler] = None) -> None:
         """Performs a single optimization step (parameter update).
 
         Parameters
@@ -101,8 +102,17 @@ class Optimizer(ABC):
             A closure that reevaluates the model and returns the loss. Optional for most optimizers.
             Refer to the :class:`torch.optim.Optimizer.step()` docstring for more details.
 
+        grad_scaler :
+            The GradScaler used to scale the loss for mixed precision training.
+            If given, the gradients will be unscaled before the step, the step will be skipped if they contain
+            infs or NaNs, and the scale will be updated after the step.
+
         """
-        self.torch_optimizer.step(closure)
+        if grad_scaler is None:
+            self.torch_optimizer.step(closure)
+        else:
+            grad_scaler.step(self.torch_optimizer, closure)
+            grad_scaler.update()
 
         if self.lr_scheduler is not None:
             self.lr_scheduler.step()
@@ -0,0 +1,52 @@
+"""
+Test cases for importing the package `pypots.classification`.
+"""
+
+# Created by Wenjie Du <wenjay.du@gmail.com>
+# License: BSD-3-Clause
+
+import subprocess
+import sys
+import unittest
+
+import pypots
+import pypots.classification
+
+
+class TestPackageImports(unittest.TestCase):
+    def test_0_lazy_importing(self):
+        # run in a fresh interpreter, other tests in this process may have imported the models already
+        code = (
+            "import sys\n"
+            "import pypots.classification\n"
+            "assert 'pypots.imputation' not in sys.modules, 'pypots.imputation got imported eagerly'\n"
+            "assert 'pypots.classification.saits' not in sys.modules, 'classification models got imported eagerly'\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+    def test_1_all_entries(self):
+        for name in pypots.__all__:
+            assert getattr(pypots, name) is not None, f"pypots.{name} can't be resolved"
+        # submodules not listed in __all__ should be reachable as well
+        for name in ["nn", "base"]:
+            assert getattr(pypots, name) is not None, f"pypots.{name} can't be resolved"
+
+        for name in pypots.classification.__all__:
+            model = getattr(pypots.classification, name)
+            assert model.__name__ == name, f"pypots.classification.{name} is resolved as {model}"
+            assert name in dir(pypots.classification)
+
+    def test_2_submodules(self):
+        # submodules were accessible as attributes when the models were imported eagerly
+        from pypots.classification.saits import SAITS
+
+        assert pypots.classification.saits.SAITS is SAITS
+        assert pypots.classification.base.BaseNNClassifier is not None
+
+        with self.assertRaises(AttributeError):
+            getattr(pypots.classification, "not_existing_attribute")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -109,6 +109,32 @@ class TestCSDI(unittest.TestCase):
         test_MSE = calc_mse(imputed_X, DATA["test_X_ori"], DATA["test_X_indicating_mask"])
         logger.info(f"Lazy-loading CSDI test_MSE: {test_MSE}, test_CRPS: {test_CRPS}")
 
+    @pytest.mark.xdist_group(name="imputation-csdi")
+    def test_5_fused_sampling(self):
+        # a batch of 5 samples with 10 sampling times takes the fused sampling in 2 chunks of at most 32 rows,
+        # fewer than the 10 passes of the sequential sampling
+        n_sampling_times = 10
+        test_X = DATA["test_X"][:5]
+        observed = ~np.isnan(test_X)
+        expected_shape = (len(test_X), n_sampling_times, DATA["n_steps"], DATA["n_features"])
+        try:
+            for fused_sampling in [True, False]:
+                self.csdi.fused_sampling = fused_sampling
+                imputed_X = self.csdi.predict({"X": test_X}, n_sampling_times=n_sampling_times)["imputation"]
+                assert imputed_X.shape == expected_shape, (
+                    f"with fused_sampling={fused_sampling}, the output shape should be {expected_shape}, "
+                    f"but got {imputed_X.shape}"
+                )
+                assert not np.isnan(imputed_X).any(), "Output still has missing values after running impute()."
+                # every sampling of every sample should keep the observed values of that very sample
+                for i in range(n_sampling_times):
+                    assert np.allclose(imputed_X[:, i][observed], test_X[observed], atol=1e-6), (
+                        f"with fused_sampling={fused_sampling}, the sampling {i} doesn't match "
+                        f"the observed values of the input samples"
+                    )
+        finally:
+            self.csdi.fused_sampling = True
+
 
 if __name__ == "__main__":
     unittest.main()
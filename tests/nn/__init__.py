@@ -0,0 +1,6 @@
+"""
+Test cases for the neural network building blocks in package `pypots.nn`.
+"""
+
+# Created by Wenjie Du <wenjay.du@gmail.com>
+# License: BSD-3-Clause
@@ -0,0 +1,148 @@
+"""
+Test cases for the error metrics in package `pypots.nn.functional.error`.
+"""
+
+# Created by Wenjie Du <wenjay.du@gmail.com>
+# License: BSD-3-Clause
+
+import math
+import unittest
+
+import numpy as np
+import torch
+
+from pypots.nn.functional import (
+    calc_mae,
+    calc_mse,
+    calc_rmse,
+    calc_mre,
+    calc_quantile_crps,
+    calc_quantile_crps_sum,
+)
+from pypots.nn.functional.error import calc_quantile_loss
+
+QUANTILES = np.arange(0.05, 1.0, 0.05)
+
+
+def reference_quantile_crps(predictions, targets, masks):
+    # the straightforward implementation calculating quantiles one by one with torch.quantile()
+    denominator = torch.sum(torch.abs(targets * masks))
+    CRPS = 0
+    for q in QUANTILES:
+        q_pred = torch.quantile(predictions, q, dim=1)
+        CRPS += calc_quantile_loss(q_pred, targets, q, masks) / denominator
+    return CRPS.item() / len(QUANTILES)
+
+
+def reference_quantile_crps_sum(predictions, targets, masks):
+    return reference_quantile_crps(predictions.sum(-1), targets.sum(-1), masks.mean(-1))
+
+
+def reference_errors(predictions, targets, masks):
+    # the straightforward out-of-place formulas of the masked MAE, MSE, RMSE and MRE
+    lib = np if isinstance(predictions, np.ndarray) else torch
+    mae = lib.sum(lib.abs(predictions - targets) * masks) / (lib.sum(masks) + 1e-12)
+    mse = lib.sum(lib.square(predictions - targets) * masks) / (lib.sum(masks) + 1e-12)
+    rmse = lib.sqrt(mse)
+    mre = lib.sum(lib.abs(predictions - targets) * masks) / (lib.sum(lib.abs(targets * masks)) + 1e-12)
+    return mae, mse, rmse, mre
+
+
+class TestErrorMetrics(unittest.TestCase):
+    n_samples, n_steps, n_features = 8, 12, 5
+
+    def generate_data(self, dtype=torch.float64):
+        torch.manual_seed(26)
+        predictions = torch.randn(self.n_samples, self.n_steps, self.n_features, dtype=dtype)
+        targets = torch.randn(self.n_samples, self.n_steps, self.n_features, dtype=dtype)
+        masks = (torch.rand(self.n_samples, self.n_steps, self.n_features) > 0.3).to(dtype)
+        return predictions, targets, masks
+
+    def assert_metrics_match_reference(self, predictions, targets, masks):
+        results = [
+            calc_mae(predictions, targets, masks),
+            calc_mse(predictions, targets, masks),
+            calc_rmse(predictions, targets, masks),
+            calc_mre(predictions, targets, masks),
+        ]
+        for name, result, reference in zip(
+            ["MAE", "MSE", "RMSE", "MRE"], results, reference_errors(predictions, targets, masks)
+        ):
+            assert np.isclose(
+                float(result), float(reference), rtol=1e-6
+            ), f"{name} is {result}, but the reference is {reference}"
+
+    def test_masked_torch(self):
+        self.assert_metrics_match_reference(*self.generate_data())
+
+    def test_masked_numpy(self):
+        predictions, targets, masks = self.generate_data()
+        self.assert_metrics_match_reference(predictions.numpy(), targets.numpy(), masks.numpy())
+
+    def test_mask_dtype_mismatch(self):
+        # masks can't be applied in place when their dtype differs from the errors' dtype
+        predictions, targets, masks = self.generate_data(dtype=torch.float32)
+        self.assert_metrics_match_reference(predictions, targets, masks.double())
+        self.assert_metrics_match_reference(
+            predictions.numpy().round().astype(int),
+            targets.numpy().round().astype(int),
+            masks.numpy(),
+        )
+
+    def test_masked_gradients(self):
+        predictions, targets, masks = self.generate_data()
+        for calc_metric, reference_index in [(calc_mae, 0), (calc_mse, 1)]:
+            inputs = predictions.clone().requires_grad_(True)
+            calc_metric(inputs, targets, masks).backward()
+
+            reference_inputs = predictions.clone().requires_grad_(True)
+            reference_errors(reference_inputs, targets, masks)[reference_index].backward()
+
+            assert torch.allclose(
+                inputs.grad, reference_inputs.grad
+            ), f"gradients through {calc_metric.__name__} don't match the reference"
+
+
+class TestQuantileCRPS(unittest.TestCase):
+    n_samples, n_steps, n_features = 8, 12, 5
+
+    def generate_data(self, n_sampling_times, dtype=torch.float64):
+        torch.manual_seed(26)
+        predictions = torch.randn(self.n_samples, n_sampling_times, self.n_steps, self.n_features, dtype=dtype)
+        targets = torch.randn(self.n_samples, self.n_steps, self.n_features, dtype=dtype)
+        masks = (torch.rand(self.n_samples, self.n_steps, self.n_features) > 0.3).to(dtype)
+        return predictions, targets, masks
+
+    def assert_close(self, value, reference):
+        assert math.isclose(value, reference, rel_tol=1e-5), f"got {value}, but the reference is {reference}"
+
+    def test_quantile_crps(self):
+        for n_sampling_times in [1, 2, 10]:
+            predictions, targets, masks = self.generate_data(n_sampling_times)
+            self.assert_close(
+                calc_quantile_crps(predictions, targets, masks),
+                reference_quantile_crps(predictions, targets, masks),
+            )
+
+    def test_quantile_crps_sum(self):
+        for n_sampling_times in [1, 2, 10]:
+            predictions, targets, masks = self.generate_data(n_sampling_times)
+            self.assert_close(
+                calc_quantile_crps_sum(predictions, targets, masks),
+                reference_quantile_crps_sum(predictions, targets, masks),
+            )
+
+    def test_numpy_inputs(self):
+        predictions, targets, masks = self.generate_data(10, dtype=torch.float32)
+        self.assert_close(
+            calc_quantile_crps(predictions.numpy(), targets.numpy(), masks.numpy()),
+            reference_quantile_crps(predictions, targets, masks),
+        )
+        self.assert_close(
+            calc_quantile_crps_sum(predictions.numpy(), targets.numpy(), masks.numpy()),
+            reference_quantile_crps_sum(predictions, targets, masks),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Test cases for the criterion classes in package `pypots.nn.modules.loss`.
+"""
+
+# Created by Wenjie Du <wenjay.du@gmail.com>
+# License: BSD-3-Clause
+
+import unittest
+
+import torch
+import torch.nn.functional as F
+
+from pypots.nn.modules.loss import CrossEntropy, NLL
+
+
+class TestClassificationCriteria(unittest.TestCase):
+    n_samples, n_classes = 16, 4
+
+    torch.manual_seed(26)
+    logits = torch.randn(n_samples, n_classes)
+    targets = torch.randint(0, n_classes, (n_samples,))
+    targets[:3] = -1  # labels to be ignored
+
+    def test_cross_entropy(self):
+        # the defaults should be the same as F.cross_entropy()
+        valid = self.targets >= 0
+        assert torch.allclose(
+            CrossEntropy()(self.logits[valid], self.targets[valid]),
+            F.cross_entropy(self.logits[valid], self.targets[valid]),
+        )
+
+        criterion = CrossEntropy(ignore_index=-1, label_smoothing=0.1)
+        assert torch.allclose(
+            criterion(self.logits, self.targets),
+            F.cross_entropy(self.logits, self.targets, ignore_index=-1, label_smoothing=0.1),
+        )
+        # ignored samples shouldn't contribute to the loss
+        assert torch.allclose(
+            CrossEntropy(ignore_index=-1)(self.logits, self.targets),
+            F.cross_entropy(self.logits[valid], self.targets[valid]),
+        )
+
+    def test_nll(self):
+        log_probs = F.log_softmax(self.logits, dim=-1)
+        valid = self.targets >= 0
+        assert torch.allclose(
+            NLL()(log_probs[valid], self.targets[valid]),
+            F.nll_loss(log_probs[valid], self.targets[valid]),
+        )
+        # ignored samples shouldn't contribute to the loss
+        assert torch.allclose(
+            NLL(ignore_index=-1)(log_probs, self.targets),
+            F.nll_loss(log_probs[valid], self.targets[valid]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Test cases for stepping optimizers with a GradScaler in mixed precision training.
+"""
+
+# Created by Wenjie Du <wenjay.du@gmail.com>
+# License: BSD-3-Clause
+
+import unittest
+
+import numpy as np
+import pytest
+import torch
+
+from pypots.imputation import SAITS
+from pypots.nn.functional import grad_scaler
+from pypots.optim import Adam
+from pypots.utils.logging import logger
+from tests.global_test_config import DATA
+from tests.optim.config import EPOCHS, TEST_SET, TRAIN_SET, VAL_SET
+
+CUDA_AVAILABLE = torch.cuda.is_available() and torch.cuda.device_count() > 0
+
+
+def init_linear_and_optimizer(device="cpu"):
+    torch.manual_seed(26)
+    linear = torch.nn.Linear(4, 1).to(device)
+    optimizer = Adam(lr=0.1)
+    optimizer.init_optimizer(linear.parameters())
+    return linear, optimizer
+
+
+class TestGradScaler(unittest.TestCase):
+    logger.info("Running tests for stepping optimizers with GradScaler...")
+
+    @pytest.mark.xdist_group(name="optim-grad_scaler")
+    def test_0_disabled_scaler(self):
+        # a disabled scaler, e.g. for training without AMP or with bfloat16 AMP, shouldn't change the step
+        inputs = torch.randn(8, 4)
+        linear, optimizer = init_linear_and_optimizer()
+        linear(inputs).sum().backward()
+        optimizer.step()
+
+        scaled_linear, scaled_optimizer = init_linear_and_optimizer()
+        scaler = grad_scaler(enabled=False)
+        scaler.scale(scaled_linear(inputs).sum()).backward()
+        scaled_optimizer.step(grad_scaler=scaler)
+
+        for param, scaled_param in zip(linear.parameters(), scaled_linear.parameters()):
+            assert torch.allclose(param, scaled_param)
+
+    @pytest.mark.xdist_group(name="optim-grad_scaler")
+    @unittest.skipUnless(CUDA_AVAILABLE, "GradScaler only works with CUDA")
+    def test_1_enabled_scaler(self):
+        inputs = torch.randn(8, 4, device="cuda")
+        linear, optimizer = init_linear_and_optimizer("cuda")
+        linear(inputs).sum().backward()
+        optimizer.step()
+
+        # the gradients get unscaled before the step, so the update should be the same as the unscaled one
+        scaled_linear, scaled_optimizer = init_linear_and_optimizer("cuda")
+        scaler = grad_scaler(enabled=True)
+        scaler.scale(scaled_linear(inputs).sum()).backward()
+        scaled_optimizer.step(grad_scaler=scaler)
+        for param, scaled_param in zip(linear.parameters(), scaled_linear.parameters()):
+            assert torch.allclose(param, scaled_param)
+
+        # the step should be skipped and the scale should be decreased if the gradients contain infs
+        params_before = [param.detach().clone() for param in scaled_linear.parameters()]
+        scale_before = scaler.get_scale()
+        scaled_optimizer.zero_grad()
+        scaler.scale(scaled_linear(inputs).sum() * float("inf")).backward()
+        scaled_optimizer.step(grad_scaler=scaler)
+        for param, param_before in zip(scaled_linear.parameters(), params_before):
+            assert torch.equal(param, param_before)
+        assert scaler.get_scale() < scale_before
+
+    @pytest.mark.xdist_group(name="optim-grad_scaler")
+    @unittest.skipUnless(CUDA_AVAILABLE, "float16 AMP only works with CUDA")
+    def test_2_float16_amp_training(self):
+        # models like MOMENT, GPT4TS and TimeLLM for imputation train with float16 AMP,
+        # where _train_model() scales the loss with an enabled GradScaler
+        saits = SAITS(
+            DATA["n_steps"],
+            DATA["n_features"],
+            n_layers=1,
+            d_model=32,
+            d_ffn=32,
+            n_heads=2,
+            d_k=16,
+            d_v=16,
+            epochs=EPOCHS,
+            device="cuda",
+        )
+        saits.amp_enabled = True
+        saits.amp_dtype = torch.float16
+        saits.fit(TRAIN_SET, VAL_SET)
+        imputed_X = saits.impute(TEST_SET)
+        assert not np.isnan(imputed_X).any(), "Output still has missing values after running impute()."
+
+
+if __name__ == "__main__":
+    unittest.main()